@@ -84,6 +84,9 @@ PROJECT_REQUIRED = _env_bool("OPENFIELD_PROJECT_REQUIRED", PLATFORM_MODE)
 SUPERVISOR_KEY_PARAM = _env("OPENFIELD_SUPERVISOR_KEY_PARAM", "sk")
 SUPERVISOR_KEY_COOKIE = _env("OPENFIELD_SUPERVISOR_KEY_COOKIE", "openfield_skey")
 
+# Responses smaller than this are not gzip/brotli-compressed.
+COMPRESS_MIN_SIZE = _env_int("OPENFIELD_COMPRESS_MIN_SIZE", 1024)
+
 HOST = _env("OPENFIELD_HOST", "127.0.0.1")
 PORT = _env_int("OPENFIELD_PORT", 5000)
 DEBUG = _env_bool(
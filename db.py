@@ -59,6 +59,49 @@ def _generate_project_tag(project_name: str) -> str:
     return re.sub(r"[^A-Z0-9]", "", tag)[:8] or "PRJ00"
 
 
+def _ensure_facilities_fts(conn: sqlite3.Connection) -> bool:
+    if _table_exists(conn, "facilities_fts"):
+        return True
+    try:
+        conn.execute(
+            """
+            CREATE VIRTUAL TABLE facilities_fts USING fts5(
+              name,
+              content='facilities',
+              content_rowid='id',
+              tokenize='unicode61 remove_diacritics 2',
+              prefix='2 3 4 5'
+            )
+            """
+        )
+    except sqlite3.OperationalError:
+        return False
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS facilities_fts_ai AFTER INSERT ON facilities BEGIN
+          INSERT INTO facilities_fts(rowid, name) VALUES (new.id, new.name);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS facilities_fts_ad AFTER DELETE ON facilities BEGIN
+          INSERT INTO facilities_fts(facilities_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS facilities_fts_au AFTER UPDATE OF name ON facilities BEGIN
+          INSERT INTO facilities_fts(facilities_fts, rowid, name) VALUES ('delete', old.id, old.name);
+          INSERT INTO facilities_fts(rowid, name) VALUES (new.id, new.name);
+        END
+        """
+    )
+    conn.execute("INSERT INTO facilities_fts(facilities_fts) VALUES ('rebuild')")
+    return True
+
+
 def init_db() -> None:
     """
     Safe init:
@@ -750,6 +793,36 @@ def init_db() -> None:
                 """
             )
 
+        # NEW: newsletter subscribers (landing page signups)
+        if not _table_exists(conn, "newsletter_subscribers"):
+            cur.execute(
+                """
+                CREATE TABLE newsletter_subscribers (
+                  id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  email TEXT NOT NULL,
+                  source TEXT,
+                  created_at TEXT
+                )
+                """
+            )
+
+        # Share-link submission failures (validation/system), shown to supervisors
+        if not _table_exists(conn, "submission_errors"):
+            cur.execute(
+                """
+                CREATE TABLE submission_errors (
+                  id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  project_id INTEGER,
+                  template_id INTEGER,
+                  survey_id INTEGER,
+                  error_type TEXT,
+                  error_message TEXT,
+                  context_json TEXT,
+                  created_at TEXT
+                )
+                """
+            )
+
         # -----------------------------
         # MIGRATIONS: surveys table gets project/enumerator linkage
         # -----------------------------
@@ -771,6 +844,8 @@ def init_db() -> None:
         # INDEXES (performance)
         # -----------------------------
         cur.execute("CREATE INDEX IF NOT EXISTS idx_facilities_name ON facilities(name)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_facilities_name_nocase ON facilities(name COLLATE NOCASE)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_enumerators_project_name_nocase ON enumerators(project_id, name COLLATE NOCASE)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_surveys_status ON surveys(status)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_surveys_enum_name ON surveys(enumerator_name)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_surveys_project ON surveys(project_id)")
@@ -779,7 +854,18 @@ def init_db() -> None:
         cur.execute("CREATE INDEX IF NOT EXISTS idx_surveys_supervisor ON surveys(supervisor_id)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_surveys_email ON surveys(respondent_email)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_surveys_client_uuid ON surveys(client_uuid)")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_surveys_dupcheck ON surveys(project_id, enumerator_name, created_at, facility_id)"
+        )
         cur.execute("CREATE INDEX IF NOT EXISTS idx_surveys_review_status ON surveys(review_status)")
+        # Serves the "facilities with surveys in project X" EXISTS lookups.
+        if "deleted_at" in _cols(conn, "surveys"):
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS idx_surveys_facility_project ON surveys(facility_id, project_id) "
+                "WHERE deleted_at IS NULL"
+            )
+        else:
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_surveys_facility_project ON surveys(facility_id, project_id)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_templates_project ON survey_templates(project_id)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_projects_org ON projects(organization_id)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_supervisors_org ON supervisors(organization_id)")
@@ -809,4 +895,11 @@ def init_db() -> None:
         cur.execute("CREATE INDEX IF NOT EXISTS idx_assign_cov ON assignment_coverage_nodes(assignment_id)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_sup_cov ON supervisor_coverage_nodes(supervisor_id)")
 
+        # -----------------------------
+        # FULL-TEXT: facility name type-ahead (FTS5, optional)
+        # -----------------------------
+        # External-content index over facilities.name kept in sync by triggers.
+        # Skipped silently when the SQLite build has no FTS5.
+        _ensure_facilities_fts(conn)
+
         conn.commit()
@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import sqlite3
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
@@ -13,18 +14,23 @@ def _now() -> str:
     return datetime.now().isoformat(timespec="seconds")
 
 
-def _assignment_cols() -> List[str]:
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("PRAGMA table_info(enumerator_assignments)")
-        return [r["name"] for r in cur.fetchall()]
+def _table_cols(table: str, conn: Optional[sqlite3.Connection] = None) -> List[str]:
+    # Callers that already hold a connection pass it in, so the lookup
+    # doesn't open another one.
+    if conn is None:
+        with get_conn() as own_conn:
+            return _table_cols(table, own_conn)
+    cur = conn.cursor()
+    cur.execute(f"PRAGMA table_info({table})")
+    return [r["name"] for r in cur.fetchall()]
 
 
-def _enum_cols() -> List[str]:
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("PRAGMA table_info(enumerators)")
-        return [r["name"] for r in cur.fetchall()]
+def _assignment_cols(conn: Optional[sqlite3.Connection] = None) -> List[str]:
+    return _table_cols("enumerator_assignments", conn)
+
+
+def _enum_cols(conn: Optional[sqlite3.Connection] = None) -> List[str]:
+    return _table_cols("enumerators", conn)
 
 
 def create_enumerator(
@@ -414,6 +420,151 @@ def list_assignment_facilities(assignment_id: int) -> List[Dict[str, Any]]:
         return [dict(r) for r in cur.fetchall()]
 
 
+def assignment_progress(assignment_id: int) -> Dict[str, int]:
+    with get_conn() as conn:
+        row = conn.execute(
+            """
+            SELECT COALESCE(SUM(CASE WHEN UPPER(COALESCE(status, ''))='DONE' THEN 1 ELSE 0 END), 0) AS completed,
+                   COUNT(*) AS total
+            FROM assignment_facilities
+            WHERE assignment_id=?
+            """,
+            (int(assignment_id),),
+        ).fetchone()
+    return {"completed": int(row["completed"]), "total": int(row["total"])}
+
+
+_BUNDLE_FACILITY_LIMIT = 500
+
+
+def _resolve_assignment_bundle(where_sql: str, params: tuple) -> Optional[Dict[str, Any]]:
+    """
+    One round-trip lookup of an assignment with its enumerator, project,
+    coverage node and facility rows. Returns {"assignment", "enumerator",
+    "project", "coverage_node", "facilities"} shaped like get_assignment /
+    get_enumerator / cov.get_node / list_assignment_facilities.
+    """
+    with get_conn() as conn:
+        a_cols = _assignment_cols(conn)
+        e_cols = _enum_cols(conn)
+        cur = conn.cursor()
+        a_active = "a.is_active" if "is_active" in a_cols else "1"
+        a_supervisor = "a.supervisor_id" if "supervisor_id" in a_cols else "NULL"
+        e_name = "e.name" if "name" in e_cols else ("e.full_name" if "full_name" in e_cols else "''")
+        e_code = "e.code" if "code" in e_cols else "''"
+        e_project = "e.project_id" if "project_id" in e_cols else "NULL"
+        e_status = "e.status" if "status" in e_cols else (
+            "CASE WHEN e.is_active=1 THEN 'ACTIVE' ELSE 'ARCHIVED' END" if "is_active" in e_cols else "'ACTIVE'"
+        )
+        cur.execute(
+            f"""
+            SELECT a.id AS a_id, a.project_id AS a_project_id, a.enumerator_id AS a_enumerator_id,
+                   {a_supervisor} AS a_supervisor_id, a.coverage_node_id AS a_coverage_node_id,
+                   a.template_id AS a_template_id, a.target_facilities_count AS a_target_facilities_count,
+                   {a_active} AS a_is_active, a.created_at AS a_created_at,
+                   e.id AS e_id, {e_project} AS e_project_id, {e_name} AS e_name, {e_code} AS e_code,
+                   e.phone AS e_phone, e.email AS e_email, {e_status} AS e_status, e.created_at AS e_created_at,
+                   p.id AS p_id, p.name AS p_name, p.allow_unlisted_facilities AS p_allow_unlisted_facilities,
+                   af.id AS af_id, af.facility_id AS af_facility_id, af.status AS af_status,
+                   af.done_survey_id AS af_done_survey_id, af.created_at AS af_created_at,
+                   f.name AS f_name,
+                   cn.id AS cn_id, cn.scheme_id AS cn_scheme_id, cn.name AS cn_name, cn.parent_id AS cn_parent_id,
+                   cn.level_index AS cn_level_index, cn.gps_lat AS cn_gps_lat, cn.gps_lng AS cn_gps_lng,
+                   cn.gps_radius_m AS cn_gps_radius_m, cn.created_at AS cn_created_at
+            FROM enumerator_assignments a
+            LEFT JOIN enumerators e ON e.id = a.enumerator_id
+            LEFT JOIN projects p ON p.id = a.project_id
+            LEFT JOIN coverage_nodes cn ON cn.id = a.coverage_node_id
+            LEFT JOIN assignment_facilities af ON af.assignment_id = a.id
+            LEFT JOIN facilities f ON f.id = af.facility_id
+            WHERE a.id = (SELECT id FROM enumerator_assignments WHERE {where_sql} LIMIT 1)
+            ORDER BY af.id ASC
+            LIMIT ?
+            """,
+            params + (_BUNDLE_FACILITY_LIMIT,),
+        )
+        rows = cur.fetchall()
+    if not rows:
+        return None
+    first = rows[0]
+    assignment = {
+        "id": first["a_id"],
+        "project_id": first["a_project_id"],
+        "enumerator_id": first["a_enumerator_id"],
+        "supervisor_id": first["a_supervisor_id"],
+        "coverage_node_id": first["a_coverage_node_id"],
+        "template_id": first["a_template_id"],
+        "target_facilities_count": first["a_target_facilities_count"],
+        "is_active": first["a_is_active"],
+        "created_at": first["a_created_at"],
+    }
+    enumerator = None
+    if first["e_id"] is not None:
+        enumerator = {
+            "id": first["e_id"],
+            "project_id": first["e_project_id"],
+            "name": first["e_name"],
+            "code": first["e_code"],
+            "phone": first["e_phone"],
+            "email": first["e_email"],
+            "status": first["e_status"],
+            "created_at": first["e_created_at"],
+        }
+    project = None
+    if first["p_id"] is not None:
+        project = {
+            "id": first["p_id"],
+            "name": first["p_name"],
+            "allow_unlisted_facilities": int(first["p_allow_unlisted_facilities"] or 0),
+        }
+    coverage_node = None
+    if first["cn_id"] is not None:
+        coverage_node = {
+            "id": first["cn_id"],
+            "scheme_id": first["cn_scheme_id"],
+            "name": first["cn_name"],
+            "parent_id": first["cn_parent_id"],
+            "level_index": first["cn_level_index"],
+            "gps_lat": first["cn_gps_lat"],
+            "gps_lng": first["cn_gps_lng"],
+            "gps_radius_m": first["cn_gps_radius_m"],
+            "created_at": first["cn_created_at"],
+        }
+    facilities = [
+        {
+            "id": r["af_id"],
+            "assignment_id": first["a_id"],
+            "facility_id": r["af_facility_id"],
+            "status": r["af_status"],
+            "done_survey_id": r["af_done_survey_id"],
+            "created_at": r["af_created_at"],
+            "facility_name": r["f_name"],
+        }
+        for r in rows
+        if r["af_id"] is not None
+    ]
+    if len(rows) >= _BUNDLE_FACILITY_LIMIT:
+        facilities = list_assignment_facilities(int(first["a_id"]))
+    return {
+        "assignment": assignment,
+        "enumerator": enumerator,
+        "project": project,
+        "coverage_node": coverage_node,
+        "facilities": facilities,
+    }
+
+
+def resolve_by_assignment_id(assignment_id: int) -> Optional[Dict[str, Any]]:
+    return _resolve_assignment_bundle("id=?", (int(assignment_id),))
+
+
+def resolve_by_code(code: str) -> Optional[Dict[str, Any]]:
+    code = (code or "").strip()
+    if not code:
+        return None
+    return _resolve_assignment_bundle("LOWER(code_full)=LOWER(?)", (code,))
+
+
 def add_assignment_facility(assignment_id: int, facility_id: int) -> int:
     with get_conn() as conn:
         cur = conn.cursor()
@@ -795,6 +795,69 @@ def project_overview(project_id: int):
     }
 
 
+def project_overviews(project_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Batch version of project_overview: one aggregate query for many projects.
+    Returns {project_id: overview}; every requested id gets an entry.
+    """
+    pids = sorted({int(pid) for pid in (project_ids or [])})
+    if not pids:
+        return {}
+    out: Dict[int, Dict[str, Any]] = {
+        pid: {
+            "total_submissions": 0,
+            "completed_submissions": 0,
+            "draft_submissions": 0,
+            "active_enumerators": 0,
+            "expected_submissions": None,
+            "project_created_at": None,
+            "last_activity": None,
+            "avg_completion_minutes": None,
+            "median_completion_minutes": None,
+            "outlier_count": 0,
+        }
+        for pid in pids
+    }
+    marks = ",".join(["?"] * len(pids))
+    with get_conn() as conn:
+        if not _table_exists(conn, "projects") or not _table_exists(conn, "surveys"):
+            return out
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            SELECT p.*,
+                   COALESCE(a.total, 0) AS agg_total,
+                   COALESCE(a.completed, 0) AS agg_completed,
+                   COALESCE(a.drafts, 0) AS agg_drafts,
+                   COALESCE(a.active_enum, 0) AS agg_active_enum
+            FROM projects p
+            LEFT JOIN (
+              SELECT project_id,
+                     COUNT(*) AS total,
+                     SUM(CASE WHEN status='COMPLETED' THEN 1 ELSE 0 END) AS completed,
+                     SUM(CASE WHEN status!='COMPLETED' THEN 1 ELSE 0 END) AS drafts,
+                     COUNT(DISTINCT enumerator_name) AS active_enum
+              FROM surveys
+              WHERE project_id IN ({marks})
+              GROUP BY project_id
+            ) a ON a.project_id = p.id
+            WHERE p.id IN ({marks})
+            """,
+            tuple(pids) + tuple(pids),
+        )
+        rows = cur.fetchall()
+    for r in rows:
+        d = dict(r)
+        ov = out[int(d["id"])]
+        ov["total_submissions"] = int(d.get("agg_total") or 0)
+        ov["completed_submissions"] = int(d.get("agg_completed") or 0)
+        ov["draft_submissions"] = int(d.get("agg_drafts") or 0)
+        ov["active_enumerators"] = int(d.get("agg_active_enum") or 0)
+        ov["expected_submissions"] = d.get("expected_submissions")
+        ov["project_created_at"] = d.get("created_at")
+    return out
+
+
 def enumerator_performance(project_id: int, days: int = 7):
     pid = int(project_id)
     with get_conn() as conn:
@@ -0,0 +1,263 @@
+// Probed once: browsers without passive listener support read an options
+// object as useCapture=true, so they get plain `false` instead.
+const supportsPassive = (function(){
+  let supported = false;
+  try{
+    const probe = Object.defineProperty({}, "passive", { get: function(){ supported = true; return false; } });
+    window.addEventListener("passive-probe", null, probe);
+    window.removeEventListener("passive-probe", null, probe);
+  }catch(e){}
+  return supported;
+})();
+const LISTEN_PASSIVE = supportsPassive ? Object.freeze({passive:true}) : false;
+const LISTEN_ACTIVE = supportsPassive ? Object.freeze({passive:false}) : false;
+
+function captureGPS(){
+  const s = document.getElementById("gps_status");
+  s.innerText = "Capturing GPS…";
+  if(!navigator.geolocation){
+    s.innerText = "Geolocation not supported on this device/browser.";
+    return;
+  }
+  navigator.geolocation.getCurrentPosition(
+    function(pos){
+      document.getElementById("gps_lat").value = pos.coords.latitude;
+      document.getElementById("gps_lng").value = pos.coords.longitude;
+      document.getElementById("gps_accuracy").value = pos.coords.accuracy;
+      document.getElementById("gps_timestamp").value = new Date().toISOString();
+      s.innerText = "GPS captured successfully.";
+    },
+    function(err){
+      const msg = err && err.message ? err.message : "Unknown error";
+      s.innerText = "GPS capture failed—continue without GPS if optional. (" + msg + ")";
+    },
+    { enableHighAccuracy: true, timeout: 15000, maximumAge: 0 }
+  );
+}
+
+(function(){
+  const fab = document.getElementById("scrollFab");
+  const icon = document.getElementById("scrollFabIcon");
+  if(!fab || !icon) return;
+  function setDir(dir){
+    if(fab.dataset.dir === dir) return;
+    // The chevron is flipped by CSS on [data-dir="up"].
+    fab.dataset.dir = dir;
+  }
+  setDir(window.scrollY < 40 ? "down" : "up");
+  if("IntersectionObserver" in window){
+    // A 40px sentinel pinned to the top of the document is in view exactly
+    // while scrollY < 40, so the browser only reports the boundary crossing.
+    const sentinel = document.createElement("div");
+    sentinel.setAttribute("aria-hidden", "true");
+    sentinel.style.cssText = "position:absolute; top:0; left:0; width:1px; height:40px; pointer-events:none; visibility:hidden;";
+    document.body.appendChild(sentinel);
+    new IntersectionObserver((entries)=>{
+      setDir(entries[entries.length - 1].isIntersecting ? "down" : "up");
+    }).observe(sentinel);
+  } else {
+    // One read and at most one write per frame, however often scroll fires.
+    let ticking = false;
+    window.addEventListener("scroll", ()=>{
+      if(ticking) return;
+      ticking = true;
+      requestAnimationFrame(()=>{
+        ticking = false;
+        setDir(window.scrollY < 40 ? "down" : "up");
+      });
+    }, LISTEN_PASSIVE);
+  }
+  fab.addEventListener("click", ()=>{
+    const dir = fab.dataset.dir || "up";
+    if(dir === "down"){
+      window.scrollTo({ top: document.body.scrollHeight, behavior: "smooth" });
+    } else {
+      window.scrollTo({ top: 0, behavior: "smooth" });
+    }
+  });
+})();
+
+(function(){
+  const toggleEl = document.getElementById("consentToggle");
+  const hidden = document.getElementById("consentObtainedHidden");
+  const wrap = document.getElementById("consentSignatureWrap");
+  const canvas = document.getElementById("consentSignaturePad");
+  const input = document.getElementById("consentSignatureInput");
+  const clearBtn = document.getElementById("consentClearBtn");
+  if(!wrap || !canvas || !input) return;
+
+  function toggle(){
+    if(hidden && toggleEl){
+      hidden.value = toggleEl.checked ? "YES" : "NO";
+    }
+    if(toggleEl && toggleEl.checked){
+      wrap.style.display = "block";
+    } else {
+      wrap.style.display = "none";
+      input.value = "";
+    }
+  }
+  if(toggleEl) toggleEl.addEventListener("change", toggle);
+  toggle();
+
+  const ctx = canvas.getContext("2d");
+  ctx.strokeStyle = "#111827";
+  ctx.lineWidth = 2;
+  ctx.lineCap = "round";
+  let drawing = false;
+
+  if(input.value){
+    // Decode the saved signature off the main thread before redrawing it.
+    const img = new Image();
+    img.decoding = "async";
+    img.src = input.value;
+    img.decode()
+      .then(()=>{ ctx.drawImage(img, 0, 0, canvas.width, canvas.height); })
+      .catch(()=>{});
+  }
+
+  // Measured once per stroke; move events reuse it unless the page scrolls.
+  let rect = null;
+  window.addEventListener("scroll", ()=>{ rect = null; }, LISTEN_PASSIVE);
+  function pos(e){
+    if(!rect) rect = canvas.getBoundingClientRect();
+    const clientX = e.touches ? e.touches[0].clientX : e.clientX;
+    const clientY = e.touches ? e.touches[0].clientY : e.clientY;
+    return { x: clientX - rect.left, y: clientY - rect.top };
+  }
+  // Samples are queued and drawn as one path per animation frame; pointer
+  // events also hand over the coalesced in-between samples.
+  let last = null;
+  let pending = [];
+  let frame = 0;
+  function flush(){
+    frame = 0;
+    if(!last || !pending.length) return;
+    ctx.beginPath();
+    ctx.moveTo(last.x, last.y);
+    for(const p of pending) ctx.lineTo(p.x, p.y);
+    ctx.stroke();
+    last = pending[pending.length - 1];
+    pending = [];
+  }
+  function start(e){
+    drawing = true;
+    rect = canvas.getBoundingClientRect();
+    last = pos(e);
+    pending = [];
+    if(e.pointerId !== undefined) canvas.setPointerCapture(e.pointerId);
+    if(e.touches){
+      // Touch fallback: touchstart stays passive, and touchmove only blocks
+      // scrolling while a stroke is in progress.
+      canvas.addEventListener("touchmove", move, LISTEN_ACTIVE);
+    } else {
+      e.preventDefault();
+    }
+  }
+  function move(e){
+    if(!drawing) return;
+    const samples = e.getCoalescedEvents ? e.getCoalescedEvents() : [];
+    if(samples.length){
+      for(const sample of samples) pending.push(pos(sample));
+    } else {
+      pending.push(pos(e));
+    }
+    if(!frame) frame = requestAnimationFrame(flush);
+    e.preventDefault();
+  }
+  function end(e){
+    if(!drawing) return;
+    if(frame) cancelAnimationFrame(frame);
+    flush();
+    drawing = false;
+    canvas.removeEventListener("touchmove", move, LISTEN_ACTIVE);
+    // Encoding is the expensive part; do it once per stroke.
+    encodeSignature();
+    e.preventDefault();
+  }
+  // Browser PNG encoders are tuned for speed, not size, so a few strokes
+  // can still cost tens of KB. The pad is flattened onto white and sent as
+  // lossy WebP, or JPEG where WebP encoding is unsupported. toBlob lets the
+  // browser run the encoder off the main thread; each stroke takes a ticket
+  // so a slower, older encode never overwrites a newer one.
+  let flat = null;
+  let ticket = 0;
+  let encoding = null;
+  function flatten(){
+    if(!flat){
+      flat = document.createElement("canvas");
+      flat.width = canvas.width;
+      flat.height = canvas.height;
+    }
+    const fctx = flat.getContext("2d");
+    fctx.fillStyle = "#fff";
+    fctx.fillRect(0, 0, flat.width, flat.height);
+    fctx.drawImage(canvas, 0, 0);
+  }
+  function toBlob(type){
+    return new Promise((resolve)=>flat.toBlob(resolve, type, 0.85));
+  }
+  function readDataUrl(blob){
+    return new Promise((resolve, reject)=>{
+      const reader = new FileReader();
+      reader.onload = ()=>resolve(reader.result);
+      reader.onerror = ()=>reject(reader.error);
+      reader.readAsDataURL(blob);
+    });
+  }
+  function encodeSignature(){
+    flatten();
+    const mine = ++ticket;
+    if(!flat.toBlob){
+      const webp = flat.toDataURL("image/webp", 0.85);
+      input.value = webp.startsWith("data:image/webp") ? webp : flat.toDataURL("image/jpeg", 0.85);
+      return;
+    }
+    // The bitmap is copied when toBlob is called, so the next stroke can
+    // reuse the flat canvas straight away.
+    const webp = toBlob("image/webp");
+    const jpeg = webp.then(b => (b && b.type === "image/webp") ? b : (mine === ticket ? toBlob("image/jpeg") : null));
+    encoding = jpeg
+      .then(blob => blob ? readDataUrl(blob) : null)
+      .then(url => {
+        // Unticking consent clears the signature; don't write it back.
+        if(url && mine === ticket && (!toggleEl || toggleEl.checked)) input.value = url;
+      })
+      .catch(()=>{})
+      .then(()=>{ if(mine === ticket) encoding = null; });
+  }
+  // A submit that lands while the last stroke is still encoding waits for
+  // it, then goes through the form's normal submit path again.
+  const form = input.form;
+  if(form && form.requestSubmit){
+    window.addEventListener("submit", (e)=>{
+      if(e.target !== form || !encoding) return;
+      e.preventDefault();
+      e.stopImmediatePropagation();
+      const submitter = e.submitter || null;
+      encoding.then(()=>form.requestSubmit(submitter));
+    }, true);
+  }
+  if(window.PointerEvent){
+    canvas.addEventListener("pointerdown", start);
+    canvas.addEventListener("pointermove", move);
+    canvas.addEventListener("pointerup", end);
+    canvas.addEventListener("pointercancel", end);
+  } else {
+    canvas.addEventListener("mousedown", start);
+    canvas.addEventListener("mousemove", move);
+    window.addEventListener("mouseup", end);
+    canvas.addEventListener("touchstart", start, LISTEN_PASSIVE);
+    canvas.addEventListener("touchend", end, LISTEN_ACTIVE);
+    canvas.addEventListener("touchcancel", end, LISTEN_ACTIVE);
+  }
+
+  if(clearBtn){
+    clearBtn.addEventListener("click", ()=>{
+      ctx.clearRect(0,0,canvas.width,canvas.height);
+      ticket += 1;
+      encoding = null;
+      input.value = "";
+    });
+  }
+})();
@@ -333,6 +333,27 @@ def list_choices(question_id: int) -> List[Tuple]:
         return cur.fetchall()
 
 
+def list_template_choices(template_id: int) -> Dict[int, List[Tuple]]:
+    """All choices of a template keyed by question id, in list_choices order."""
+    order_col = _order_col_choices()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            SELECT c.id, c.template_question_id, c.choice_text, c.{order_col} AS display_order
+            FROM template_question_choices c
+            JOIN template_questions q ON q.id = c.template_question_id
+            WHERE q.template_id=?
+            ORDER BY c.template_question_id ASC, display_order ASC, c.id ASC
+            """,
+            (int(template_id),),
+        )
+        out: Dict[int, List[Tuple]] = {}
+        for r in cur.fetchall():
+            out.setdefault(int(r["template_question_id"]), []).append(r)
+        return out
+
+
 # -------------------------------------------------
 # Import from TEXT / DOCX / PDF
 # -------------------------------------------------
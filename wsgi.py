@@ -1,7 +1,7 @@
 import os
 
 import config
-from app import app, ensure_drafts_table, init_db
+from app import app, ensure_drafts_table, init_db, refresh_schema_cache
 
 
 # Ensure required runtime folders/tables exist when running via Gunicorn/Werkzeug.
@@ -10,3 +10,4 @@ os.makedirs(config.UPLOAD_DIR, exist_ok=True)
 os.makedirs(config.EXPORT_DIR, exist_ok=True)
 init_db()
 ensure_drafts_table()
+refresh_schema_cache()